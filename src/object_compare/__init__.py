@@ -1,15 +1,21 @@
+from object_compare.object_compare_cache import fetch_cached_proc_checksums
 from object_compare.object_compare_fetch_objects import (
-    fetch_definitions,
+    fetch_checksums,
+    query_checksums,
 )
 from object_compare.object_compare_utils import (
     ChecksumData,
     ComparisonResult,
+    checksum_definition,
     print_comparison_result,
 )
 
 __all__ = [
     "ChecksumData",
     "ComparisonResult",
+    "checksum_definition",
     "print_comparison_result",
-    "fetch_definitions",
+    "fetch_cached_proc_checksums",
+    "fetch_checksums",
+    "query_checksums",
 ]
@@ -1,5 +1,8 @@
-import hashlib
-from typing import Dict, Set
+import argparse
+import heapq
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple
 
 from dotenv import load_dotenv
 from rich.markup import escape
@@ -10,7 +13,8 @@ from rich.text import Text
 from object_compare import (
     ChecksumData,
     ComparisonResult,
-    fetch_definitions,
+    fetch_cached_proc_checksums,
+    fetch_checksums,
     print_comparison_result,
 )
 from utils import Connection, get_config, get_connection, modify_connection_for_database
@@ -22,9 +26,9 @@ def compare_definitions(
     schema_name: str,
     object_type: str,
     display_name: str,
+    use_cache: bool = True,
 ) -> None:
     object_checksums = {}
-    all_object_names: Set[str] = set()
 
     with Progress(
         SpinnerColumn(),
@@ -33,19 +37,27 @@ def compare_definitions(
     ) as progress:
         task = progress.add_task(f"• Processing {display_name}s...", total=len(connections))
 
-        # Fetch objects and calculate checksums for each environment
-        for env, connection in connections.items():
-            objects = fetch_definitions(connection, schema_name, object_type)
-            all_object_names.update(objects.keys())
-
-            # Calculate checksums
-            object_checksums[env] = {
-                obj_name: hashlib.md5(" ".join(definition.split()).encode("utf-8")).hexdigest()[
-                    -10:
-                ]
-                for obj_name, definition in objects.items()
-            }
-            progress.advance(task)
+        def _fetch_env(env: str, connection: Connection) -> Tuple[str, Dict[str, str]]:
+            if use_cache and object_type == "stored_proc":
+                env_checksums = fetch_cached_proc_checksums(connection, env, schema_name)
+            else:
+                env_checksums = fetch_checksums(connection, schema_name, object_type)
+            return env, env_checksums
+
+        # Fetch checksums for each environment concurrently, the work is dominated by
+        # network round-trips so the threads overlap while pyodbc releases the GIL
+        with ThreadPoolExecutor(max_workers=max(len(connections), 1)) as executor:
+            for env, env_checksums in executor.map(
+                _fetch_env, connections.keys(), connections.values()
+            ):
+                object_checksums[env] = env_checksums
+                progress.advance(task)
+
+        # Each environment's checksums are already ordered by name, so a merge of the sorted
+        # streams gives the unique object names in order without re-sorting
+        all_object_names = [
+            name for name, _ in itertools.groupby(heapq.merge(*object_checksums.values()))
+        ]
 
         progress.update(
             task, description=f"  • Found {len(all_object_names)} {display_name}s. [green]Done![/]"
@@ -54,6 +66,7 @@ def compare_definitions(
 
     # Setup table for results
     env_names = list(connections.keys())
+    env_checksums_list = [object_checksums[env] for env in env_names]
     result = ComparisonResult(schema_name=schema_name, object_type=display_name)
 
     with Progress(
@@ -65,8 +78,8 @@ def compare_definitions(
             f"• Comparing {display_name}s...", total=len(all_object_names)
         )
 
-        for obj_name in sorted(all_object_names):
-            checksums = [object_checksums[env].get(obj_name, "N/A") for env in env_names]
+        for obj_name in all_object_names:
+            checksums = [by_name.get(obj_name, "N/A") for by_name in env_checksums_list]
 
             checksum_data = ChecksumData(
                 object_name=obj_name, checksums=checksums, environments=env_names
@@ -88,6 +101,16 @@ def compare_definitions(
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare SQL object definitions across environments"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore the on-disk stored procedure checksum cache and fetch everything",
+    )
+    args = parser.parse_args()
+
     load_dotenv()
     object_compare_config = get_config("object_compare")
     schema = object_compare_config["schema"]
@@ -159,7 +182,9 @@ def main() -> None:
         if obj_type in display_names:
             display_type = display_names[obj_type]
             console.print(f"\n[bold magenta]⚡ Processing {display_type}s[/]")
-            compare_definitions(connections, schema, obj_type, display_type)
+            compare_definitions(
+                connections, schema, obj_type, display_type, use_cache=not args.no_cache
+            )
             console.print(f"[bold green]✓ {display_type.capitalize()}s comparison complete![/]")
         else:
             console.print(f"[yellow]Warning:[/] Unknown object type '{obj_type}' skipped")
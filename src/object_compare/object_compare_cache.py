@@ -0,0 +1,168 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+from object_compare.object_compare_fetch_objects import fetch_proc_modify_dates, query_checksums
+from utils import Connection
+from utils.rich_utils import console
+
+CACHE_DIR = Path.home() / ".cache" / "mssql-tools" / "proc_checksums"
+# Bump when the cache layout or checksum format changes so older files are ignored
+CACHE_VERSION = 1
+# Shown in place of a checksum for a changed procedure whose new checksum couldn't be fetched
+ERROR_CHECKSUM = "ERR"
+
+
+def get_cache_path(env: str) -> Path:
+    """Get the cache file path for an environment."""
+    return CACHE_DIR / f"{env}.json"
+
+
+def load_proc_cache(env: str, conn: Connection, schema_name: str) -> Dict[str, Tuple[str, str]]:
+    """
+    Load cached stored procedure checksums for an environment.
+
+    The cache is ignored if it's missing, unreadable, malformed, from another
+    cache version, or was written for a different server, database or schema.
+
+    Args:
+        env: Environment name
+        conn: Database connection the cache must belong to
+        schema_name: Schema the cache must belong to
+
+    Returns:
+        Dictionary of procedure names to (modify_date, checksum)
+    """
+    try:
+        with open(get_cache_path(env), "r") as f:
+            cache: Dict[str, Any] = json.load(f)
+
+        if (
+            cache.get("version") != CACHE_VERSION
+            or cache.get("server") != conn.server
+            or cache.get("database") != conn.database
+            or cache.get("schema") != schema_name
+        ):
+            return {}
+
+        procedures: Dict[str, Tuple[str, str]] = {}
+        for name, entry in cache["procedures"].items():
+            # Each entry must be a [modify_date, checksum] pair of strings
+            if (
+                not isinstance(entry, list)
+                or len(entry) != 2
+                or not all(isinstance(value, str) for value in entry)
+            ):
+                return {}
+            procedures[name] = (entry[0], entry[1])
+        return procedures
+    except (OSError, ValueError, TypeError, AttributeError, KeyError):
+        # A non-object file or "procedures" value raises AttributeError/TypeError/KeyError
+        return {}
+
+
+def save_proc_cache(
+    env: str, conn: Connection, schema_name: str, procedures: Dict[str, Tuple[str, str]]
+) -> None:
+    """
+    Save stored procedure checksums for an environment.
+
+    Args:
+        env: Environment name
+        conn: Database connection the checksums were fetched from
+        schema_name: Schema the checksums were fetched from
+        procedures: Dictionary of procedure names to (modify_date, checksum)
+    """
+    cache = {
+        "version": CACHE_VERSION,
+        "server": conn.server,
+        "database": conn.database,
+        "schema": schema_name,
+        "procedures": procedures,
+    }
+
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(get_cache_path(env), "w") as f:
+            json.dump(cache, f)
+    except OSError as e:
+        console.print(f"[yellow]Warning:[/] Could not write checksum cache for {env}: {e}")
+
+
+def fetch_cached_proc_checksums(conn: Connection, env: str, schema_name: str) -> Dict[str, str]:
+    """
+    Fetch stored procedure checksums, reusing cached checksums for unchanged procedures.
+
+    Only procedure names and modify dates are listed up front; checksums are
+    fetched again only for procedures whose modify_date differs from the cache.
+
+    Args:
+        conn: Database connection
+        env: Environment name, used to locate the cache file
+        schema_name: Schema to query
+
+    Returns:
+        Dictionary of procedure names to their definition checksums
+    """
+    cached = load_proc_cache(env, conn, schema_name)
+
+    try:
+        proc_modify_dates = fetch_proc_modify_dates(conn, schema_name)
+    except Exception as e:
+        console.print(
+            f"Error fetching stored procedure modify dates for schema '{schema_name}': {e}"
+        )
+        return {}
+
+    modify_dates = {
+        name: modify_date.isoformat() for name, modify_date in proc_modify_dates.items()
+    }
+    stale = {
+        name
+        for name, modify_date in modify_dates.items()
+        if name not in cached or cached[name][0] != modify_date
+    }
+
+    fresh: Dict[str, str] = {}
+    if stale:
+        # Everything modified since the oldest stale procedure covers all of them
+        modified_since = min(proc_modify_dates[name] for name in stale)
+        try:
+            fresh = query_checksums(conn, schema_name, "stored_proc", modified_since)
+        except Exception as e:
+            # Leave the cache file untouched and only reuse checksums of unchanged procedures,
+            # a changed procedure's old checksum could hide a real difference
+            console.print(
+                f"[yellow]Warning:[/] Error fetching stored procedure checksums for {env}, "
+                f"changed procedures are shown as {ERROR_CHECKSUM}: {e}"
+            )
+            return {
+                name: ERROR_CHECKSUM if name in stale else cached[name][1] for name in modify_dates
+            }
+
+    # Results follow the listing's name order, which the comparison merge relies on
+    checksums: Dict[str, str] = {}
+    procedures: Dict[str, Tuple[str, str]] = {}
+    missing = []
+    for name, modify_date in modify_dates.items():
+        if name in fresh:
+            procedures[name] = (modify_date, fresh[name])
+        elif name not in stale:
+            procedures[name] = cached[name]
+        else:
+            # Changed but not returned, flag it rather than hide it or reuse the old checksum
+            missing.append(name)
+            checksums[name] = ERROR_CHECKSUM
+            continue
+        checksums[name] = procedures[name][1]
+
+    if missing:
+        console.print(
+            f"[yellow]Warning:[/] No checksum returned for changed stored procedures in {env}: "
+            f"{', '.join(missing)}"
+        )
+
+    # Missing procedures stay out of the cache so they're fetched again on the next run
+    save_proc_cache(env, conn, schema_name, procedures)
+
+    return checksums
@@ -1,23 +1,75 @@
-from typing import Dict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 
+from object_compare.object_compare_utils import checksum_definition
 from utils import Connection
 from utils.rich_utils import console
 
+# Binary collation orders names by code point, the same order Python sorts strings in,
+# so the per-environment results can be merged without sorting them again
+NAME_COLLATION = "Latin1_General_BIN2"
 
-def fetch_definitions(conn: Connection, schema_name: str, object_type: str) -> Dict[str, str]:
+
+def fetch_checksums(
+    conn: Connection,
+    schema_name: str,
+    object_type: str,
+    modified_since: Optional[datetime] = None,
+) -> Dict[str, str]:
+    """
+    Fetch definition checksums for a given schema and object type.
+
+    Errors are reported to the console and result in an empty dictionary,
+    see query_checksums for a version that raises instead.
+
+    Args:
+        conn: Database connection
+        schema_name: Schema to query
+        object_type: Type of object to fetch
+        modified_since: Only fetch objects modified at or after this time
+            (server-side checksum types only)
+
+    Returns:
+        Dictionary of object names to their definition checksums
+    """
+    try:
+        return query_checksums(conn, schema_name, object_type, modified_since)
+    except Exception as e:
+        console.print(f"Error fetching {object_type} checksums for schema '{schema_name}': {e}")
+        return {}
+
+
+def query_checksums(
+    conn: Connection,
+    schema_name: str,
+    object_type: str,
+    modified_since: Optional[datetime] = None,
+) -> Dict[str, str]:
     """
-    Fetch object definitions for a given schema and object type.
+    Query definition checksums for a given schema and object type.
+
+    Object types with a server-side checksum query are hashed by SQL Server so only
+    the digest is transferred, all others are hashed locally from their definitions.
 
     Args:
         conn: Database connection
         schema_name: Schema to query
         object_type: Type of object to fetch
-            (stored_proc, view, function, table, trigger, sequence)
+        modified_since: Only fetch objects modified at or after this time
+            (server-side checksum types only)
 
     Returns:
-        Dictionary of object names to their definitions
+        Dictionary of object names to their definition checksums
+
+    Raises:
+        Exception: Any database error raised while connecting or querying
     """
-    query = get_query_for_object_type(schema_name, object_type)
+    query = get_checksum_query_for_object_type(schema_name, object_type, modified_since)
+    params: List[Any] = [modified_since] if modified_since is not None else []
+    hash_locally = not query
+    if hash_locally:
+        query = get_query_for_object_type(schema_name, object_type)
+        params = []
     if not query:
         console.print(f"[yellow]Warning:[/] Unknown object type '{object_type}'")
         return {}
@@ -27,25 +79,138 @@ def fetch_definitions(conn: Connection, schema_name: str, object_type: str) -> D
     with conn.get_connection() as db_conn:
         cursor = db_conn.cursor()
         try:
-            cursor.execute(query)
-            for row in cursor.fetchall():
-                name = row[0]  # First column is always the object name
-                definition = row[1]  # Second column is always the definition
+            cursor.execute(query, *params)
+            # Stream the rows so each definition is hashed and released as soon as it arrives
+            for row in cursor:
+                name = row[0]
+                value = row[1]
 
-                # Skip objects with NULL definitions
-                if definition:
-                    result[name] = definition
+                if not hash_locally:
+                    result[name] = value
+                elif value:  # Skip objects with NULL definitions
+                    result[name] = checksum_definition(value)
 
             return result
-        except Exception as e:
-            console.print(
-                f"Error fetching {object_type} definitions for schema '{schema_name}': {e}"
-            )
-            return {}
         finally:
             cursor.close()
 
 
+def fetch_proc_modify_dates(conn: Connection, schema_name: str) -> Dict[str, datetime]:
+    """
+    Fetch the last modification time of every stored procedure in a schema.
+
+    Procedures without a readable definition (e.g. WITH ENCRYPTION) are skipped,
+    matching the stored procedure checksum query.
+
+    Args:
+        conn: Database connection
+        schema_name: Schema to query
+
+    Returns:
+        Dictionary of procedure names to their modify_date
+
+    Raises:
+        Exception: Any database error raised while connecting or querying
+    """
+    query = f"""
+    SELECT
+        OBJECT_NAME(o.object_id) AS procedure_name,
+        o.modify_date
+    FROM sys.objects o
+    INNER JOIN sys.schemas s ON o.schema_id = s.schema_id
+    WHERE o.type = 'P' AND s.name = '{schema_name}'
+    AND OBJECT_NAME(o.object_id) NOT LIKE 'sp[_]%diagram%'
+    AND NULLIF(OBJECT_DEFINITION(o.object_id), '') IS NOT NULL
+    ORDER BY OBJECT_NAME(o.object_id) COLLATE {NAME_COLLATION}
+    """
+
+    with conn.get_connection() as db_conn:
+        cursor = db_conn.cursor()
+        try:
+            cursor.execute(query)
+            return {row[0]: row[1] for row in cursor}
+        finally:
+            cursor.close()
+
+
+# Code points other than the space that str.isspace() treats as whitespace, so the
+# server-side normalization folds the same characters as checksum_definition
+WHITESPACE_CODE_POINTS = (
+    *range(9, 14),  # TAB, LF, VT, FF, CR
+    *range(28, 32),  # FS, GS, RS, US
+    133,  # NEL
+    160,  # NBSP
+    5760,
+    *range(8192, 8203),
+    8232,
+    8233,
+    8239,
+    8287,
+    12288,
+)
+
+
+def normalize_whitespace_sql(expression: str) -> str:
+    """
+    Wrap a T-SQL string expression so runs of whitespace collapse to a single space.
+
+    Every whitespace character is translated to a space, then repeated spaces are
+    collapsed using NCHAR(7) (BEL) as a marker and the result is trimmed, matching
+    the client-side normalization. A definition that itself contains a BEL
+    character loses it, so its checksum can differ from the client-side one.
+    Requires SQL Server 2017+ for TRANSLATE.
+    """
+    characters = " + ".join(f"NCHAR({code_point})" for code_point in WHITESPACE_CODE_POINTS)
+    spaces = f"REPLICATE(N' ', {len(WHITESPACE_CODE_POINTS)})"
+    # A binary collation makes REPLACE match the marker characters exactly
+    translated = f"TRANSLATE({expression} COLLATE Latin1_General_BIN2, {characters}, {spaces})"
+    return f"""LTRIM(RTRIM(REPLACE(REPLACE(REPLACE(
+        {translated},
+        N' ', N' ' + NCHAR(7)), NCHAR(7) + N' ', N''), NCHAR(7), N'')))"""
+
+
+def get_checksum_query_for_object_type(
+    schema_name: str, object_type: str, modified_since: Optional[datetime] = None
+) -> str:
+    """
+    Get a SQL query that returns object names and server-side definition checksums.
+
+    Args:
+        schema_name: Schema name to use in the query
+        object_type: Type of database object
+        modified_since: When set, the query filters on modify_date with a ? parameter
+
+    Returns:
+        SQL query string or empty string if the object type is hashed client-side
+    """
+    match object_type:
+        case "stored_proc":
+            definition = normalize_whitespace_sql("OBJECT_DEFINITION(o.object_id)")
+            # modify_date is a legacy DATETIME stored in 1/300 second steps and the bound
+            # value has been rounded to whole milliseconds, so widen the bound to include it
+            modified_filter = (
+                "AND o.modify_date >= DATEADD(ms, -4, CAST(? AS DATETIME))"
+                if modified_since is not None
+                else ""
+            )
+            return f"""
+            SELECT
+                OBJECT_NAME(o.object_id) AS procedure_name,
+                LOWER(RIGHT(CONVERT(VARCHAR(32), HASHBYTES('MD5', {definition}), 2), 16))
+                    AS procedure_checksum
+            FROM sys.objects o
+            INNER JOIN sys.schemas s ON o.schema_id = s.schema_id
+            WHERE o.type = 'P' AND s.name = '{schema_name}'
+            AND OBJECT_NAME(o.object_id) NOT LIKE 'sp[_]%diagram%'
+            AND NULLIF(OBJECT_DEFINITION(o.object_id), '') IS NOT NULL
+            {modified_filter}
+            ORDER BY OBJECT_NAME(o.object_id) COLLATE {NAME_COLLATION}
+            """
+
+        case _:
+            return ""
+
+
 def get_query_for_object_type(schema_name: str, object_type: str) -> str:
     """
     Get the appropriate SQL query for the given object type.
@@ -67,6 +232,7 @@ def get_query_for_object_type(schema_name: str, object_type: str) -> str:
             INNER JOIN sys.schemas s ON o.schema_id = s.schema_id
             WHERE o.type = 'P' AND s.name = '{schema_name}'
             AND OBJECT_NAME(o.object_id) NOT LIKE 'sp[_]%diagram%'
+            ORDER BY OBJECT_NAME(o.object_id) COLLATE {NAME_COLLATION}
             """
 
         case "view":
@@ -77,6 +243,7 @@ def get_query_for_object_type(schema_name: str, object_type: str) -> str:
             FROM sys.objects o
             INNER JOIN sys.schemas s ON o.schema_id = s.schema_id
             WHERE o.type = 'V' AND s.name = '{schema_name}'
+            ORDER BY OBJECT_NAME(o.object_id) COLLATE {NAME_COLLATION}
             """
 
         case "function":
@@ -88,6 +255,7 @@ def get_query_for_object_type(schema_name: str, object_type: str) -> str:
             INNER JOIN sys.schemas s ON o.schema_id = s.schema_id
             WHERE o.type IN ('FN', 'IF', 'TF') AND s.name = '{schema_name}'
             AND OBJECT_NAME(o.object_id) != 'fn_diagramobjects'
+            ORDER BY OBJECT_NAME(o.object_id) COLLATE {NAME_COLLATION}
             """
 
         case "table":
@@ -131,6 +299,7 @@ def get_query_for_object_type(schema_name: str, object_type: str) -> str:
                 AND t.is_ms_shipped = 0
                 AND t.name NOT IN ('sysdiagrams', 'database_firewall_rules')
             GROUP BY t.name
+            ORDER BY t.name COLLATE {NAME_COLLATION}
             """
 
         case "trigger":
@@ -142,6 +311,7 @@ def get_query_for_object_type(schema_name: str, object_type: str) -> str:
             INNER JOIN sys.objects o ON tr.parent_id = o.object_id
             INNER JOIN sys.schemas s ON o.schema_id = s.schema_id
             WHERE s.name = '{schema_name}'
+            ORDER BY tr.name COLLATE {NAME_COLLATION}
             """
 
         case "sequence":
@@ -173,6 +343,7 @@ def get_query_for_object_type(schema_name: str, object_type: str) -> str:
             INNER JOIN sys.schemas s ON seq.schema_id = s.schema_id
             INNER JOIN sys.types t ON seq.user_type_id = t.user_type_id
             WHERE s.name = '{schema_name}'
+            ORDER BY seq.name COLLATE {NAME_COLLATION}
             """
 
         case "index":
@@ -213,6 +384,7 @@ def get_query_for_object_type(schema_name: str, object_type: str) -> str:
             AND NOT (i.is_primary_key = 1 AND o.type = 'TF') -- Exclude table-valued functions
             AND i.type > 0 -- Skip heaps
             GROUP BY i.object_id, i.name, i.is_unique, i.type, i.filter_definition
+            ORDER BY i.name COLLATE {NAME_COLLATION}
             """
 
         case "type":
@@ -287,6 +459,7 @@ def get_query_for_object_type(schema_name: str, object_type: str) -> str:
             WHERE
                 s.name = '{schema_name}'
                 AND tt.is_user_defined = 1
+            ORDER BY tt.name COLLATE {NAME_COLLATION}
             """
 
         case "external_table":
@@ -351,6 +524,7 @@ def get_query_for_object_type(schema_name: str, object_type: str) -> str:
             WHERE s.name = '{schema_name}'
             GROUP BY et.name, ds.name, et.location, ff.name,
                      et.reject_type, et.reject_value, et.reject_sample_value
+            ORDER BY et.name COLLATE {NAME_COLLATION}
             """
 
         case _:
@@ -1,3 +1,5 @@
+import hashlib
+import re
 from dataclasses import dataclass, field
 from typing import List, Optional
 
@@ -5,6 +7,8 @@ from rich.table import Table
 
 from utils.rich_utils import COLORS, console
 
+_WHITESPACE_RE = re.compile(r"\s+")
+
 
 @dataclass
 class ChecksumData:
@@ -13,8 +17,11 @@ class ChecksumData:
     environments: List[str] = field(default_factory=list)
 
     def has_differences(self) -> bool:
-        valid_checksums = [cs for cs in self.checksums]
-        return len(set(valid_checksums)) > 1
+        # Stop at the first checksum that differs, a missing object ("N/A") counts as different
+        if not self.checksums:
+            return False
+        first = self.checksums[0]
+        return any(cs != first for cs in self.checksums)
 
 
 @dataclass
@@ -32,6 +39,23 @@ class ComparisonResult:
         return [row.checksums for row in self.checksum_rows if row.has_differences()]
 
 
+def checksum_definition(definition: str) -> str:
+    """Calculate a short checksum of an object definition, ignoring whitespace differences.
+
+    The checksum only needs to detect equality across environments, so a 64-bit
+    BLAKE2b digest is used, which is faster than MD5 and wide enough to make
+    collisions hiding a real difference negligible.
+
+    Args:
+        definition: The object definition text
+
+    Returns:
+        Hex string checksum of the normalized definition
+    """
+    normalized = _WHITESPACE_RE.sub(" ", definition).strip()
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).hexdigest()
+
+
 def get_checksum_style(checksums: List[str], current_checksum: str) -> str:
     """Determine the style for a checksum based on its relationship to others.
 
@@ -1,10 +1,26 @@
+import contextlib
+import queue
+import threading
 import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, datetime
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
+import pyodbc
 from dotenv import load_dotenv
 
-from utils import Connection, get_config, get_connection
+from usp_tester.usp_tester_types import ProcCall, ProcResult
+from utils import Connection, bulk_insert, get_config, get_connection
+
+# Serializes console output from the worker threads so lines don't interleave
+print_lock = threading.Lock()
+
+
+def log(message: str) -> None:
+    """Print a message while holding the shared print lock."""
+    with print_lock:
+        print(message)
 
 
 def get_default_for_date_type(
@@ -16,107 +32,196 @@ def get_default_for_date_type(
     :param date_defaults: A dictionary containing default values for date and datetime types.
     :return: The default value for the parameter.
     """
-    param_name_lower = param_name.lower()
+    name = param_name.lower()
+    is_datetime = "datetime" in name
 
-    if "start" in param_name_lower:
-        if "datetime" in param_name_lower:
-            return date_defaults["start_datetime"]
-        return date_defaults["start_date"]
-    elif "end" in param_name_lower:
-        if "datetime" in param_name_lower:
-            return date_defaults["end_datetime"]
-        return date_defaults["end_date"]
-    else:
-        return date_defaults["start_date"]
+    if "start" in name:
+        return date_defaults["start_datetime" if is_datetime else "start_date"]
+    if "end" in name:
+        return date_defaults["end_datetime" if is_datetime else "end_date"]
+    return date_defaults["start_date"]
 
 
-def execute_procedure(
-    conn: Connection,
+def build_proc_call(
     schema: str,
     proc_name: str,
+    params: List[Tuple[str, str]],
     defaults: Dict[str, Any],
-    logging_level: str,
-) -> Dict[str, str]:
+) -> ProcCall:
     """
-    Execute a single stored procedure with the given parameters.
+    Build the statement and arguments for a stored procedure once, ahead of execution.
 
-    :param conn: The database connection object.
     :param schema: The schema name for the stored procedure.
     :param proc_name: The name of the stored procedure.
+    :param params: The (name, data type) of each procedure parameter in ordinal order.
     :param defaults: A dictionary containing default values for parameter types.
+    :return: The prepared call, reused for every execution of the procedure.
+    """
+    # Prepare default mapping for non-date types
+    default_map = {
+        "int": defaults["integer"],
+        "bit": defaults["bit"],
+        "decimal": defaults["decimal"],
+        "varchar": defaults["varchar"],
+        "nvarchar": defaults["varchar"],
+    }
+
+    proc_args: List[Any] = []
+    for param_name, param_type in params:
+        # Check for date or datetime types based on name and type
+        if param_type in ["date", "datetime", "smalldatetime"]:
+            proc_args.append(get_default_for_date_type(param_name, defaults))
+        else:
+            # Use the default mapping for other types
+            proc_args.append(
+                default_map.get(param_type, None)
+            )  # Fallback to None if type isn't mapped
+
+    # Bind the arguments as parameters so the statement text is stable across calls
+    placeholders = f" ({', '.join(['?'] * len(proc_args))})" if proc_args else ""
+    exec_query = f"{{CALL [{schema}].[{proc_name}]{placeholders}}}"
+
+    return ProcCall(proc_name=proc_name, exec_query=exec_query, args=tuple(proc_args))
+
+
+def execute_procedure(
+    db_conn: pyodbc.Connection,
+    proc_call: ProcCall,
+    logging_level: str,
+) -> Tuple[ProcResult, bool]:
+    """
+    Execute a single stored procedure with its prepared arguments.
+
+    :param db_conn: An open database connection, shared across procedure executions.
+    :param proc_call: The prepared statement and arguments for the stored procedure.
     :param logging_level: Expects a string value ("verbose", "errors_only", or "summary").
+    :return: The result, and whether the connection can still be used afterwards.
     """
+    proc_name = proc_call.proc_name
 
-    with conn.get_connection() as db_conn:
-        cursor = db_conn.cursor()
-        try:
-            # Fetch parameters for the stored procedure
-            param_query = f"""
-            SELECT PARAMETER_NAME, DATA_TYPE
-            FROM INFORMATION_SCHEMA.PARAMETERS
-            WHERE SPECIFIC_SCHEMA = '{schema}' AND SPECIFIC_NAME = '{proc_name}'
-            """
-            cursor.execute(param_query)
-            parameters = cursor.fetchall()
-
-            # Prepare default mapping for non-date types
-            default_map = {
-                "int": defaults["integer"],
-                "bit": defaults["bit"],
-                "decimal": defaults["decimal"],
-                "varchar": defaults["varchar"],
-                "nvarchar": defaults["varchar"],
-            }
-
-            proc_args = []
-            for param in parameters:
-                param_name, param_type = param
-
-                # Check for date or datetime types based on name and type
-                if param_type in ["date", "datetime", "smalldatetime"]:
-                    proc_args.append(get_default_for_date_type(param_name, defaults))
-                else:
-                    # Use the default mapping for other types
-                    proc_args.append(
-                        default_map.get(param_type, None)
-                    )  # Fallback to None if type isn't mapped
-
-            # Build the EXEC query with f-strings for the procedure name and placeholders
-            placeholder_str = ", ".join(
-                [f"'{arg}'" if arg is not None else "NULL" for arg in proc_args]
-            )
-            exec_query = f"EXEC [{schema}].[{proc_name}] {placeholder_str}"
+    cursor = db_conn.cursor()
+    try:
+        start_time = time.perf_counter()
 
-            start_time = time.time()
+        if logging_level == "verbose":
+            log(f"Running: {proc_call.exec_query}")
 
-            if logging_level == "verbose":
-                print(f"Running: {exec_query}")
+        cursor.execute(proc_call.exec_query, *proc_call.args)
+
+        elapsed_time = time.perf_counter() - start_time
+
+        if logging_level == "verbose":
+            log(f"Executed with arguments: {list(proc_call.args)} in {elapsed_time:.2f} seconds")
+
+        result = ProcResult(proc_name=proc_name, status="success", elapsed_time=elapsed_time)
+
+    except Exception as e:
+        if logging_level in ["verbose", "errors_only"]:
+            log(f"Error executing {proc_name}: {e}")
+
+        result = ProcResult(proc_name=proc_name, status="fail", error_message=str(e))
+
+    # Discard any work done by the procedure so it doesn't leak into the next execution
+    try:
+        cursor.close()
+        db_conn.rollback()
+    except Exception as e:
+        # The procedure broke the connection (e.g. a communication link failure or a
+        # severity 20+ error), so it can't be reused for the next execution
+        if logging_level in ["verbose", "errors_only"]:
+            log(f"Connection lost after executing {proc_name}: {e}")
+
+        if result.status == "success":
+            result = ProcResult(proc_name=proc_name, status="fail", error_message=str(e))
+        return result, False
 
-            cursor.execute(exec_query)
+    return result, True
 
-            end_time = time.time()
-            elapsed_time = end_time - start_time
+
+def execute_procedures(
+    connection: Connection,
+    proc_queue: queue.Queue[ProcCall],
+    logging_level: str,
+) -> List[ProcResult]:
+    """
+    Worker that executes queued stored procedures over its own connection until the queue is empty.
+
+    :param connection: The connection settings, each worker opens its own connection.
+    :param proc_queue: The queue of prepared stored procedure calls shared by all workers.
+    :param logging_level: Expects a string value ("verbose", "errors_only", or "summary").
+    """
+    results = []
+    db_conn: Optional[pyodbc.Connection] = None
+    try:
+        while True:
+            try:
+                proc_call = proc_queue.get_nowait()
+            except queue.Empty:
+                break
+
+            log(f"Executing stored procedure: [{proc_call.proc_name}]")
+
+            # Any error is recorded against the procedure so every dequeued call gets a result
+            try:
+                if db_conn is None:
+                    db_conn = connection.connect()
+                result, connection_ok = execute_procedure(db_conn, proc_call, logging_level)
+            except Exception as e:
+                if logging_level in ["verbose", "errors_only"]:
+                    log(f"Error executing {proc_call.proc_name}: {e}")
+                result = ProcResult(
+                    proc_name=proc_call.proc_name, status="fail", error_message=str(e)
+                )
+                connection_ok = False
+            results.append(result)
+
+            if not connection_ok and db_conn is not None:
+                # Drop the broken connection, the next procedure opens a new one
+                with contextlib.suppress(Exception):
+                    db_conn.close()
+                db_conn = None
 
             if logging_level == "verbose":
-                print(f"Executed with arguments: {proc_args} in {elapsed_time:.2f} seconds")
+                log("")
+    finally:
+        if db_conn is not None:
+            with contextlib.suppress(Exception):
+                db_conn.close()
 
-            return {
-                "proc_name": proc_name,
-                "status": "success",
-                "elapsed_time": str(elapsed_time),
-            }
+    return results
 
-        except Exception as e:
-            end_time = time.time()
-            if logging_level in ["verbose", "errors_only"]:
-                print(f"Error executing {proc_name}: {e}")
 
-            return {
-                "proc_name": proc_name,
-                "status": "fail",
-                "elapsed_time": "",
-                "error_message": str(e),
-            }
+def run_workers(
+    connection: Connection,
+    proc_queue: queue.Queue[ProcCall],
+    worker_count: int,
+    logging_level: str,
+) -> Dict[str, ProcResult]:
+    """
+    Execute the queued stored procedures on a pool of workers.
+
+    :param connection: The connection settings, each worker opens its own connection.
+    :param proc_queue: The queue of prepared stored procedure calls.
+    :param worker_count: The number of workers to run concurrently.
+    :param logging_level: Expects a string value ("verbose", "errors_only", or "summary").
+    :return: The results collected from the workers, keyed by procedure name.
+    """
+    results_by_proc: Dict[str, ProcResult] = {}
+    with ThreadPoolExecutor(max_workers=worker_count) as executor:
+        futures = [
+            executor.submit(execute_procedures, connection, proc_queue, logging_level)
+            for _ in range(worker_count)
+        ]
+        for future in as_completed(futures):
+            try:
+                worker_results = future.result()
+            except Exception as e:
+                print(f"Error in stored procedure worker: {e}")
+                continue
+            for result in worker_results:
+                results_by_proc[result.proc_name] = result
+
+    return results_by_proc
 
 
 def main() -> None:
@@ -126,51 +231,89 @@ def main() -> None:
     defaults = usp_config["defaults"]
     schema = usp_config["schema"]
     logging_level = usp_config["logging_level"]
+    parallelism = max(int(usp_config.get("parallelism", 4)), 1)
+    results_table = usp_config.get("results_table", None)
 
     connection = get_connection("USP_TEST_DB")
 
     print(f"Executing script on server: [{connection.server}] in database: [{connection.database}]")
-    print(f"Using logging_level: {logging_level}\n")
+    print(f"Using logging_level: {logging_level}")
+    print(f"Using parallelism: {parallelism}\n")
 
     stored_procedures: List[str] = []
+    params_by_proc: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
 
     with connection.get_connection() as db_conn:
         cursor = db_conn.cursor()
         try:
             # Fetch stored procedures in the given schema
-            query = f"""
-            SELECT SPECIFIC_NAME
-            FROM INFORMATION_SCHEMA.ROUTINES
-            WHERE ROUTINE_TYPE = 'PROCEDURE'
-            AND ROUTINE_SCHEMA = '{schema}'
-            ORDER BY SPECIFIC_NAME;
+            query = """
+            SELECT p.name
+            FROM sys.procedures p
+            WHERE p.schema_id = SCHEMA_ID(?)
+            ORDER BY p.name;
             """
-            cursor.execute(query)
+            cursor.execute(query, schema)
             stored_procedures = [proc[0] for proc in cursor.fetchall()]
 
+            # Fetch parameters for every procedure in the schema in a single round-trip
+            param_query = """
+            SELECT p.name, prm.name, TYPE_NAME(prm.system_type_id)
+            FROM sys.parameters prm
+            INNER JOIN sys.procedures p ON p.object_id = prm.object_id
+            WHERE p.schema_id = SCHEMA_ID(?)
+            ORDER BY p.name, prm.parameter_id;
+            """
+            cursor.execute(param_query, schema)
+            for proc_name, param_name, param_type in cursor.fetchall():
+                params_by_proc[proc_name].append((param_name, param_type))
+
         except Exception as e:
             print(f"Error fetching schema sizes: {e}")
 
-        results = []
-        for proc in stored_procedures:
-            proc_name = proc[0]
-            print(f"Executing stored procedure: [{proc_name}]")
-
-            result = execute_procedure(connection, schema, proc_name, defaults, logging_level)
-            results.append(result)
-
-            if logging_level == "verbose":
-                print("")
-
-        if logging_level == "summary":
-            print("Execution Summary:")
-            print(f"{'Procedure Name':<50} {'Status':<10} {'Execution Time':<15}")
-            print("-" * 76)
-            for result in results:
-                proc_name = result["proc_name"]
-                status = result["status"]
-                elapsed_time = f"{result['elapsed_time']:.2f}" if result["elapsed_time"] else "N/A"
-                print(f"{proc_name:<50} {status:<10} {elapsed_time:<15}")
+    # Arguments only depend on the parameter metadata, so each call is prepared up front
+    proc_queue: queue.Queue[ProcCall] = queue.Queue()
+    for proc_name in stored_procedures:
+        proc_queue.put(build_proc_call(schema, proc_name, params_by_proc[proc_name], defaults))
+
+    # Each worker holds one connection and pulls procedures until the queue is drained
+    worker_count = min(parallelism, max(len(stored_procedures), 1))
+    results_by_proc = run_workers(connection, proc_queue, worker_count, logging_level)
+
+    # A procedure without a result was lost with its worker, report it as failed
+    results = [
+        results_by_proc.get(
+            proc_name,
+            ProcResult(proc_name=proc_name, status="fail", error_message="No result returned"),
+        )
+        for proc_name in stored_procedures
+    ]
+
+    if results_table:
+        # fast_executemany rejects fractional seconds beyond the column's scale, so send
+        # whole seconds which fit DATETIME as well as DATETIME2
+        run_at = datetime.now().replace(microsecond=0)
+        rows = [(run_at, r.proc_name, r.status, r.elapsed_time, r.error_message) for r in results]
+        try:
+            inserted = bulk_insert(
+                connection,
+                results_table,
+                rows,
+                columns=["RunAt", "ProcName", "Status", "ElapsedTime", "ErrorMessage"],
+            )
+            print(f"Logged {inserted} results to {results_table}\n")
+        except Exception as e:
+            print(f"Error logging results to {results_table}: {e}\n")
+
+    if logging_level == "summary":
+        print("Execution Summary:")
+        print(f"{'Procedure Name':<50} {'Status':<10} {'Execution Time':<15}")
+        print("-" * 76)
+        for result in results:
+            elapsed_time = (
+                f"{result.elapsed_time:.2f}" if result.elapsed_time is not None else "N/A"
+            )
+            print(f"{result.proc_name:<50} {result.status:<10} {elapsed_time:<15}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+
+@dataclass(slots=True)
+class ProcResult:
+    proc_name: str
+    status: str  # "success" or "fail"
+    elapsed_time: Optional[float] = None
+    error_message: str = ""
+
+
+@dataclass(slots=True)
+class ProcCall:
+    proc_name: str
+    exec_query: str  # ODBC {CALL ...} statement with ? placeholders
+    args: Tuple[Any, ...]
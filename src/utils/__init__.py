@@ -1,5 +1,17 @@
 from utils.config_utils import get_config
-from utils.connection_utils import Connection, get_connection, modify_connection_for_database
+from utils.connection_utils import (
+    Connection,
+    bulk_insert,
+    get_connection,
+    modify_connection_for_database,
+)
 from utils.rich_utils import COLORS
 
-__all__ = ["Connection", "get_config", "get_connection", "modify_connection_for_database", "COLORS"]
+__all__ = [
+    "Connection",
+    "bulk_insert",
+    "get_config",
+    "get_connection",
+    "modify_connection_for_database",
+    "COLORS",
+]
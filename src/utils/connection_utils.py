@@ -1,16 +1,25 @@
 import contextlib
+import functools
 import os
 import re
-from dataclasses import dataclass
-from typing import Generator, Optional, Union
+from dataclasses import dataclass, field
+from typing import Any, Generator, Optional, Sequence, Union
 
 import psycopg2
 import pyodbc
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
 
+# Keep ODBC connection pooling enabled so reconnecting to the same server reuses handles
+pyodbc.pooling = True
+
 ConnectionType = Union[pyodbc.Connection, "psycopg2.extensions.connection"]
 
+_MSSQL_SERVER_RE = re.compile(r"Server\s*=\s*([^;]+)", re.IGNORECASE)
+_MSSQL_DATABASE_RE = re.compile(r"Database\s*=\s*([^;]+)", re.IGNORECASE)
+_PG_HOST_RE = re.compile(r"host\s*=\s*([^\s]+)", re.IGNORECASE)
+_PG_DBNAME_RE = re.compile(r"dbname\s*=\s*([^\s]+)", re.IGNORECASE)
+
 
 @dataclass
 class Connection:
@@ -18,6 +27,7 @@ class Connection:
     db_type: Optional[str] = None  # "mssql" or "postgres"
     driver: Optional[str] = None
     encrypt: Optional[str] = None
+    _engine: Optional[Engine] = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         """Set default values for if not provided."""
@@ -40,11 +50,11 @@ class Connection:
             if conn:
                 conn.close()
 
-    @property
+    @functools.cached_property
     def server(self) -> str:
-        """Extract server name from connection string."""
+        """Extract server name from connection string, parsed once per instance."""
         if self.db_type == "mssql":
-            server_match = re.search(r"Server\s*=\s*([^;]+)", self.connection_string, re.IGNORECASE)
+            server_match = _MSSQL_SERVER_RE.search(self.connection_string)
             if server_match:
                 # Extract the full server portion (might include port)
                 server_port = server_match.group(1).strip()
@@ -52,19 +62,19 @@ class Connection:
                 server_name = server_port.split(",")[0].strip()
                 return server_name
         elif self.db_type == "postgres":
-            host_match = re.search(r"host\s*=\s*([^\s]+)", self.connection_string, re.IGNORECASE)
+            host_match = _PG_HOST_RE.search(self.connection_string)
             if host_match:
                 return host_match.group(1).strip()
         return ""
 
-    @property
+    @functools.cached_property
     def database(self) -> str:
-        """Extract database name from connection string."""
+        """Extract database name from connection string, parsed once per instance."""
         if self.db_type == "mssql":
-            db_match = re.search(r"Database\s*=\s*([^;]+)", self.connection_string, re.IGNORECASE)
+            db_match = _MSSQL_DATABASE_RE.search(self.connection_string)
             return db_match.group(1) if db_match else ""
         elif self.db_type == "postgres":
-            db_match = re.search(r"dbname\s*=\s*([^\s]+)", self.connection_string, re.IGNORECASE)
+            db_match = _PG_DBNAME_RE.search(self.connection_string)
             return db_match.group(1) if db_match else ""
         return ""
 
@@ -89,26 +99,31 @@ class Connection:
         Get a SQLAlchemy engine for this connection.
 
         This creates a SQLAlchemy engine that can be used with pandas
-        and other libraries that work with SQLAlchemy.
+        and other libraries that work with SQLAlchemy. The engine is created
+        on first use and reused afterwards, since it owns the connection pool.
 
         Returns:
             SQLAlchemy engine instance
         """
+        if self._engine is not None:
+            return self._engine
+
         if self.db_type == "mssql":
             # Create SQLAlchemy engine using the pyodbc driver
             odbc_connect = self.full_connection_string
             engine = create_engine(f"mssql+pyodbc:///?odbc_connect={odbc_connect}")
-            return engine
         elif self.db_type == "postgres" or self.db_type == "pg":
             if self.connection_string.startswith("postgresql://"):
                 engine = create_engine(self.connection_string)
             else:
                 # For connection strings in key=value format
                 engine = create_engine(f"postgresql+psycopg2://{self.connection_string}")
-            return engine
         else:
             raise ValueError(f"Unsupported database type: {self.db_type}")
 
+        self._engine = engine
+        return engine
+
     def __str__(self) -> str:
         return f"Server: [{self.server}] Database: [{self.database}] Type: [{self.db_type}]"
 
@@ -164,3 +179,44 @@ def modify_connection_for_database(connection: Connection, database_name: str) -
         driver=connection.driver,
         encrypt=connection.encrypt,
     )
+
+
+def bulk_insert(
+    connection: Connection,
+    table: str,
+    rows: Sequence[Sequence[Any]],
+    columns: Optional[Sequence[str]] = None,
+) -> int:
+    """
+    Insert rows into a table with a single batched executemany call.
+
+    For SQL Server the cursor uses fast_executemany, so pyodbc sends the rows
+    as ODBC parameter arrays instead of one round-trip per row.
+
+    Args:
+        connection: Connection to insert through
+        table: Target table name, e.g. "dbo.TestResults"
+        rows: Rows to insert, each with one value per column
+        columns: Optional column names, otherwise values must match the table's columns
+
+    Returns:
+        Number of rows inserted
+    """
+    if not rows:
+        return 0
+
+    placeholder = "?" if connection.db_type == "mssql" else "%s"
+    placeholders = ", ".join([placeholder] * len(rows[0]))
+    column_list = f" ({', '.join(columns)})" if columns else ""
+    query = f"INSERT INTO {table}{column_list} VALUES ({placeholders})"
+
+    with connection.get_connection() as db_conn:
+        cursor = db_conn.cursor()
+        try:
+            if isinstance(cursor, pyodbc.Cursor):
+                cursor.fast_executemany = True
+            cursor.executemany(query, rows)
+            db_conn.commit()
+            return len(rows)
+        finally:
+            cursor.close()
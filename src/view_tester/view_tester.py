@@ -30,7 +30,7 @@ def fetch_views(conn: Connection, schema: str) -> List[str]:
 def execute_view(
     conn: Connection, schema: str, view_name: str, logging_level: str
 ) -> Dict[str, Any]:
-    result = {
+    result: Dict[str, Any] = {
         "view_name": view_name,
         "status": "Success",
         "elapsed_time": None,
@@ -40,14 +40,13 @@ def execute_view(
     with conn.get_connection() as db_conn:
         cursor = db_conn.cursor()
         try:
-            start_time = time.time()
+            start_time = time.perf_counter()
 
             query = f"SELECT TOP 1 * FROM [{schema}].[{view_name}]"
             cursor.execute(query)
             cursor.fetchone()
 
-            end_time = time.time()
-            result["elapsed_time"] = f"{end_time - start_time}"
+            result["elapsed_time"] = time.perf_counter() - start_time
 
             if logging_level == "verbose":
                 print(f"Successfully queried view [{view_name}]")
@@ -96,8 +95,8 @@ def print_results_summary(results: List[Dict[str, Any]], logging_level: str) ->
         for result in results:
             view_name = result["view_name"]
             status = result["status"]
-            if result["elapsed_time"]:
-                elapsed_time = f"{float(result['elapsed_time']):.2f}s"
+            if result["elapsed_time"] is not None:
+                elapsed_time = f"{result['elapsed_time']:.2f}s"
             else:
                 elapsed_time = "N/A"
             print(f"{view_name:<50} {status:<10} {elapsed_time:<15}")
@@ -113,7 +112,11 @@ def print_results_summary(results: List[Dict[str, Any]], logging_level: str) ->
             if result["status"] == "Error":
                 error_count += 1
                 view_name = result["view_name"]
-                elapsed_time = f"{result['elapsed_time']:.2f}s" if result["elapsed_time"] else "N/A"
+                elapsed_time = (
+                    f"{result['elapsed_time']:.2f}s"
+                    if result["elapsed_time"] is not None
+                    else "N/A"
+                )
                 print(f"{view_name:<50} {'Error':<10} {elapsed_time:<15}")
                 if result.get("error_message"):
                     print(f"    Error: {result['error_message']}")